@@ -1,6 +1,6 @@
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLabel,
-    QPushButton, QStackedWidget, QTextEdit, QRadioButton,
+    QPushButton, QStackedWidget, QTextEdit, QPlainTextEdit, QRadioButton,
     QLineEdit, QFileDialog, QHBoxLayout, QCheckBox, QMessageBox, QStyle, QProgressBar, QSpacerItem, QSizePolicy
 )
 import os
@@ -16,6 +16,17 @@ import webbrowser
 import json
 import base64
 import logging
+import re
+import threading
+import queue
+import tempfile
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import url2pathname
+from archive_formats import (
+    ARCHIVE_URL, ARCHIVE_REQUEST_HEADERS, extract_archive, format_size
+)
 from yarl import URL
 from io import BytesIO
 
@@ -30,21 +41,205 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
+
+def load_mirror_config():
+    """Mirrors of the Spotr archive and their shared SHA-256, from mirrors.json if there is one.
+
+    mirrors.json holds {"mirrors": [...], "sha256": "..."}, each mirror an HTTP
+    URL or a file path. Without it GitHub is the only source.
+    """
+    # Next to the executable when frozen by PyInstaller, next to this script otherwise
+    if getattr(sys, 'frozen', False):
+        installer_directory = os.path.dirname(sys.executable)
+    else:
+        installer_directory = os.path.dirname(os.path.abspath(__file__))
+    config_path = os.path.join(installer_directory, 'mirrors.json')
+    try:
+        with open(config_path, "r") as file:
+            config = json.load(file)
+    except FileNotFoundError:
+        return [ARCHIVE_URL], None
+    except ValueError as e:
+        log.error("Ignoring malformed %s: %s", config_path, e)
+        return [ARCHIVE_URL], None
+    mirrors = config.get('mirrors') if isinstance(config, dict) else None
+    sha256 = config.get('sha256') if isinstance(config, dict) else None
+    if (not isinstance(mirrors, list) or not mirrors
+            or not all(isinstance(mirror, str) for mirror in mirrors)
+            or not isinstance(sha256, (str, type(None)))):
+        log.error("Ignoring %s, expected {\"mirrors\": [...], \"sha256\": \"...\"} with at least one mirror",
+                  config_path)
+        return [ARCHIVE_URL], None
+    return mirrors, sha256
+
 logging.basicConfig(filename='error.log', level=logging.ERROR)
 log = logging.getLogger()
 ACCOUNT_URL_SPOTIFY = URL.build(scheme="https", host="accounts.spotify.com")
 ACCOUNT_URL_GENIUS = "https://api.genius.com/oauth/authorize"  # Genius Auth URL
+LOG_MAX_LINES = 1000  # Lines kept in the install log, oldest are dropped first
+LOG_FLUSH_INTERVAL = 100  # Milliseconds between install log updates
+INSTALL_STOP_TIMEOUT = 15000  # Milliseconds Cancel waits for the install to finish its current step
+# Archives downloaded ahead of time are staged here until the install picks them up
+STAGING_DIR = os.path.join(tempfile.gettempdir(), 'SpotrInstaller')
+STAGED_ARCHIVE_PATH = os.path.join(STAGING_DIR, 'spotr-main.archive')
+# Used by the preflight when the server doesn't report the real sizes
+ARCHIVE_SIZE_ESTIMATE = 1024 * 1024
+EXTRACT_RATIO_ESTIMATE = 4
+DEPENDENCY_SPACE_ESTIMATE = 50 * 1024 * 1024  # Spotr's pip requirements, installed
+ARCHIVE_MIRRORS, ARCHIVE_SHA256 = load_mirror_config()
+MIRROR_PROBE_SIZE = 64 * 1024  # Bytes fetched from each mirror to compare them
+MIRROR_PROBE_TIMEOUT = 5
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # Seconds, upper bounds of the latency histogram
+# Spotify IDs and numbers in paths are collapsed so one endpoint is counted once
+ID_SEGMENT = re.compile(r'^(?:[0-9A-Za-z]{22}|\d+)$')
+METRICS_PATH = os.environ.get('SPOTR_METRICS_FILE')  # .json for a snapshot, anything else for Prometheus text
+
+
+def endpoint_name(method, url):
+    """Name an API call by method, host and path, with IDs replaced by {id}"""
+    url = URL(str(url))
+    path = '/'.join('{id}' if ID_SEGMENT.match(segment) else segment
+                    for segment in url.path.split('/'))
+    return f"{method.upper()} {url.host}{path}"
+
+
+def prometheus_labels(**labels):
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+class APIMetrics:
+    """Latency, status code, retry and traffic counters for the calls API makes"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.lock = threading.Lock()
+        self.buckets = buckets
+        self.latency = {}  # endpoint -> bucket counts, sum and count of call durations
+        self.status_codes = {}  # (endpoint, status code) -> calls, 'error' when no response came back
+        self.retries = {}
+        self.refreshes = 0
+        self.bytes_sent = {}
+        self.bytes_received = {}
+        self.hooks = []
+
+    def add_hook(self, hook):
+        """Call hook(event) after every observed call, event is a dictionary describing it"""
+        self.hooks.append(hook)
+
+    def observe(self, endpoint, elapsed, response=None):
+        status = response.status_code if response is not None else 'error'
+        sent = len(response.request.body or b'') if response is not None else 0
+        received = len(response.content) if response is not None else 0
+        with self.lock:
+            latency = self.latency.setdefault(
+                endpoint, {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for index, bound in enumerate(self.buckets):
+                if elapsed <= bound:
+                    latency['buckets'][index] += 1
+            latency['sum'] += elapsed
+            latency['count'] += 1
+            key = (endpoint, status)
+            self.status_codes[key] = self.status_codes.get(key, 0) + 1
+            self.bytes_sent[endpoint] = self.bytes_sent.get(endpoint, 0) + sent
+            self.bytes_received[endpoint] = self.bytes_received.get(
+                endpoint, 0) + received
+        event = {'endpoint': endpoint, 'status': status, 'elapsed': elapsed,
+                 'bytes_sent': sent, 'bytes_received': received}
+        for hook in self.hooks:
+            # A broken hook must not break the call it observes
+            try:
+                hook(event)
+            except Exception as e:
+                log.error("Metrics hook %r failed: %s", hook, e)
+
+    def count_retry(self, endpoint):
+        with self.lock:
+            self.retries[endpoint] = self.retries.get(endpoint, 0) + 1
+
+    def count_refresh(self):
+        with self.lock:
+            self.refreshes += 1
+
+    def snapshot(self):
+        """Return all metrics as a JSON serialisable dictionary"""
+        with self.lock:
+            return {
+                'buckets': list(self.buckets),
+                'latency': {endpoint: {'buckets': list(latency['buckets']),
+                                       'sum': latency['sum'], 'count': latency['count']}
+                            for endpoint, latency in self.latency.items()},
+                'status_codes': [{'endpoint': endpoint, 'status': status, 'count': count}
+                                 for (endpoint, status), count in self.status_codes.items()],
+                'retries': dict(self.retries),
+                'refreshes': self.refreshes,
+                'bytes_sent': dict(self.bytes_sent),
+                'bytes_received': dict(self.bytes_received),
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=4)
+
+    def to_prometheus(self):
+        """Return all metrics in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [
+            '# HELP spotr_api_request_duration_seconds Duration of API calls.',
+            '# TYPE spotr_api_request_duration_seconds histogram',
+        ]
+        for endpoint, latency in snapshot['latency'].items():
+            for bound, count in zip(snapshot['buckets'], latency['buckets']):
+                lines.append(
+                    f"spotr_api_request_duration_seconds_bucket{prometheus_labels(endpoint=endpoint, le=bound)} {count}")
+            lines.append(
+                f"spotr_api_request_duration_seconds_bucket{prometheus_labels(endpoint=endpoint, le='+Inf')} {latency['count']}")
+            lines.append(
+                f"spotr_api_request_duration_seconds_sum{prometheus_labels(endpoint=endpoint)} {latency['sum']}")
+            lines.append(
+                f"spotr_api_request_duration_seconds_count{prometheus_labels(endpoint=endpoint)} {latency['count']}")
+        lines += [
+            '# HELP spotr_api_responses_total API calls by status code.',
+            '# TYPE spotr_api_responses_total counter',
+        ]
+        for entry in snapshot['status_codes']:
+            lines.append(
+                f"spotr_api_responses_total{prometheus_labels(endpoint=entry['endpoint'], status=entry['status'])} {entry['count']}")
+        for name, help_text, key in (
+            ('spotr_api_retries_total', 'API calls repeated after refreshing the key.', 'retries'),
+            ('spotr_api_sent_bytes_total', 'Request body bytes sent.', 'bytes_sent'),
+            ('spotr_api_received_bytes_total', 'Response body bytes received.', 'bytes_received'),
+        ):
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+            for endpoint, value in snapshot[key].items():
+                lines.append(f"{name}{prometheus_labels(endpoint=endpoint)} {value}")
+        lines += [
+            '# HELP spotr_api_token_refreshes_total Access token refreshes.',
+            '# TYPE spotr_api_token_refreshes_total counter',
+            f"spotr_api_token_refreshes_total {snapshot['refreshes']}",
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write a JSON snapshot if path ends in .json, otherwise a Prometheus text file"""
+        with open(path, "w") as file:
+            file.write(self.to_json() if path.endswith('.json') else self.to_prometheus())
 
 
 class API:
     """API class for sending all requests"""
 
-    def __init__(self, spotify_client_id, spotify_client_secret, directory):
+    def __init__(self, spotify_client_id, spotify_client_secret, directory, metrics=None):
         self.spotify_client_id = spotify_client_id
         self.spotify_client_secret = spotify_client_secret
         self.config_path = os.path.join(directory, 'Spotr', 'config.json')
         # Load existing config if it exists, otherwise start with an empty dictionary
         self.CONFIG = self.load_config()
+        # While Spotr is being installed its folder may be replaced, so writes wait until resume_writes
+        self.defer_writes = False
+        self.write_pending = False
+        self.metrics = metrics or APIMetrics()
 
     def load_config(self):
         """Load configuration from file."""
@@ -56,6 +251,9 @@ class API:
 
     def write_config(self):
         """Write configuration to file."""
+        if self.defer_writes:
+            self.write_pending = True
+            return
         print(f'Writing config to {self.config_path}: {
               self.CONFIG}')  # Debugging line
         try:
@@ -64,6 +262,35 @@ class API:
         except Exception as e:
             print(f'Error writing config: {e}')  # Debugging line
 
+    def resume_writes(self):
+        """Write any configuration held back while writes were deferred."""
+        self.defer_writes = False
+        if self.write_pending:
+            self.write_pending = False
+            self.write_config()
+
+    def export_metrics(self):
+        """Write the metrics to SPOTR_METRICS_FILE, if it is set"""
+        if not METRICS_PATH:
+            return
+        try:
+            self.metrics.write(METRICS_PATH)
+        except OSError as e:
+            # Runs on the way out, where a bad path must not hide why the app is exiting
+            log.error("Could not write metrics to %s: %s", METRICS_PATH, e)
+
+    def send(self, method, url, **kwargs):
+        """Send a request through requests, recording it in metrics"""
+        endpoint = endpoint_name(method, url)
+        start = time.perf_counter()
+        try:
+            response = requests.request(method, url, **kwargs)
+        except requests.RequestException:
+            self.metrics.observe(endpoint, time.perf_counter() - start)
+            raise
+        self.metrics.observe(endpoint, time.perf_counter() - start, response)
+        return response
+
     def request(
         self,
         method,
@@ -75,19 +302,21 @@ class API:
         if headers is None:
             headers = {"Authorization": f"Bearer {self.CONFIG['key']}"}
 
-        response = requests.request(
+        response = self.send(
             method, url, headers=headers, json=json, timeout=10)
 
         if response.status_code in (401, 400):
             self.refresh_key()
             headers = {"Authorization": f"Bearer {self.CONFIG['key']}"}
-            response = requests.request(
+            self.metrics.count_retry(endpoint_name(method, url))
+            response = self.send(
                 method, url, headers=headers, json=json, timeout=10)
 
         if not response.ok:
-            log.warning("[bold red]request error - status-code: %d",
-                        response.status_code)
+            log.warning("request error - %s - status-code: %d",
+                        endpoint_name(method, url), response.status_code)
             log.info(response.json())
+            self.export_metrics()
             sys.exit()
 
         try:
@@ -101,7 +330,9 @@ class API:
         """Refresh API key"""
         url = ACCOUNT_URL_SPOTIFY / "api" / "token"
 
-        response = requests.post(
+        self.metrics.count_refresh()
+        response = self.send(
+            "POST",
             url,
             data={
                 "grant_type": "refresh_token",
@@ -112,12 +343,13 @@ class API:
         )
         if not response.ok:
             log.warning(
-                "[bold red]request error - status-code: %d",
+                "refresh error - status-code: %d",
                 response.status_code,
             )
             log.info(
-                "[bold blue]Most likely something wrong with base_64 or refresh_token, try running 'spotr authorise'"
+                "Most likely something wrong with base_64 or refresh_token, try running 'spotr authorise'"
             )
+            self.export_metrics()
             sys.exit()
         data = response.json()
         self.CONFIG["key"] = data["access_token"]
@@ -138,9 +370,10 @@ class API:
 
         spotify_client_id = self.spotify_client_id
 
-        auth_request = requests.get(
+        auth_request = self.send(
+            "GET",
             spotify_auth_url,
-            {
+            params={
                 "client_id": spotify_client_id,
                 "response_type": "code",
                 "redirect_uri": "https://www.google.com/",
@@ -168,12 +401,13 @@ class API:
             "redirect_uri": "https://www.google.com/",
         }
 
-        access_token_request = requests.post(
-            url=spotify_token_url, data=payload, headers=headers, timeout=10
+        access_token_request = self.send(
+            "POST", spotify_token_url, data=payload, headers=headers, timeout=10
         )
 
         if not access_token_request.ok:
             log.warning("Request error: %d", access_token_request.status_code)
+            self.export_metrics()
             sys.exit()
 
         access_token_response_data = access_token_request.json()
@@ -183,57 +417,550 @@ class API:
         self.write_config()
 
 
+def load_staged_meta(meta_path):
+    """Load what is known about a staged archive, or an empty dictionary"""
+    try:
+        with open(meta_path, "r") as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_staged_meta(meta_path, meta):
+    with open(meta_path, "w") as file:
+        json.dump(meta, file)
+
+
+def discard_staged_archive():
+    """Remove every staged download"""
+    shutil.rmtree(STAGING_DIR, ignore_errors=True)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        while chunk := file.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def local_source_path(source):
+    """File path a mirror points to, or None if it is served over HTTP"""
+    if source.startswith(('http://', 'https://')):
+        return None
+    if source.startswith('file://'):
+        return url2pathname(URL(source).path)
+    return source
+
+
+def source_validators(source, response=None):
+    """ETag and Last-Modified of a mirror, for a file its size and modification time stand in"""
+    path = local_source_path(source)
+    if path:
+        stat = os.stat(path)
+        return None, f"{stat.st_size}-{stat.st_mtime_ns}"
+    return response.headers.get('ETag'), response.headers.get('Last-Modified')
+
+
+def probe_mirror(source):
+    """Seconds to read the first MIRROR_PROBE_SIZE bytes of a mirror, covering latency and throughput"""
+    start = time.perf_counter()
+    path = local_source_path(source)
+    if path:
+        with open(path, 'rb') as file:
+            file.read(MIRROR_PROBE_SIZE)
+        return time.perf_counter() - start
+    response = requests.get(source, headers={**ARCHIVE_REQUEST_HEADERS, 'Range': f'bytes=0-{MIRROR_PROBE_SIZE - 1}'},
+                            stream=True, timeout=MIRROR_PROBE_TIMEOUT)
+    with response:
+        response.raise_for_status()
+        received = 0
+        # A mirror that ignores the range sends everything, stop at the probe size anyway
+        for chunk in response.iter_content(chunk_size=8192):
+            received += len(chunk)
+            if received >= MIRROR_PROBE_SIZE:
+                break
+    return time.perf_counter() - start
+
+
+def rank_mirrors(sources):
+    """Probe every mirror at once and return them fastest first, unreachable ones last"""
+    if len(sources) < 2:
+        return list(sources)
+
+    def timed_probe(source):
+        try:
+            return probe_mirror(source)
+        except (requests.RequestException, OSError) as e:
+            log.info("Mirror probe failed for %s: %s", source, e)
+            return float('inf')
+
+    with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+        timings = list(executor.map(timed_probe, sources))
+    return [source for _, source in sorted(zip(timings, sources), key=lambda pair: pair[0])]
+
+
+def read_file_chunks(path, offset):
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        while chunk := file.read(8192):
+            yield chunk
+
+
+def read_response_chunks(response):
+    with response:
+        yield from response.iter_content(chunk_size=8192)
+
+
+def open_source(source, offset, if_range=None):
+    """Start reading a mirror at offset.
+
+    if_range is the validator the staged bytes were downloaded under, if it no
+    longer matches the mirror is read from the start. Returns the chunks, the
+    offset they really start at, the archive size (0 if unknown) and the
+    mirror's validators.
+    """
+    path = local_source_path(source)
+    if path:
+        validators = source_validators(source)
+        size = os.path.getsize(path)
+        if (if_range and if_range != validators[1]) or offset > size:
+            offset = 0
+        return read_file_chunks(path, offset), offset, size, validators
+
+    headers = dict(ARCHIVE_REQUEST_HEADERS)
+    if offset:
+        headers['Range'] = f'bytes={offset}-'
+        if if_range:
+            headers['If-Range'] = if_range
+    response = requests.get(source, headers=headers, stream=True, timeout=10)
+    if response.status_code == 416:
+        # The staged bytes don't fit the archive any more, start over
+        response.close()
+        return open_source(source, 0)
+    if response.status_code == 206:
+        start = offset
+    else:
+        # A full response means the archive changed or ranges aren't supported
+        response.raise_for_status()
+        start = 0
+    length = int(response.headers.get('Content-Length', 0))
+    total = start + length if length else 0
+    return read_response_chunks(response), start, total, source_validators(source, response)
+
+
+def staged_size(path, sources, sha256=None):
+    """Bytes already staged at path that a download from sources can resume from"""
+    meta = load_staged_meta(path + '.json')
+    if sha256:
+        # Every mirror serves the same bytes, so any of them can continue
+        resumable = meta.get('sha256') == sha256
+    else:
+        resumable = meta.get('source') in sources and (
+            meta.get('etag') or meta.get('last_modified'))
+    if not resumable:
+        return 0
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def staged_archive_unchanged(path, meta, sources, sha256=None):
+    """Whether a completely staged archive is known to still be the current one"""
+    if not os.path.exists(path):
+        return False
+    if sha256:
+        return meta.get('sha256') == sha256 and file_sha256(path) == sha256
+    source = meta.get('source')
+    if source not in sources:
+        return False
+    if not local_source_path(source) and not (meta.get('etag') or meta.get('last_modified')):
+        return False
+    headers = dict(ARCHIVE_REQUEST_HEADERS)
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    else:
+        headers['If-Modified-Since'] = meta.get('last_modified')
+    try:
+        if local_source_path(source):
+            return source_validators(source)[1] == meta.get('last_modified')
+        response = requests.get(source, headers=headers, stream=True, timeout=10)
+        response.close()
+    except (requests.RequestException, OSError) as e:
+        # The mirror it came from is gone, so the copy is unknown and the other mirrors take over
+        log.info("Could not revalidate the staged archive against %s: %s", source, e)
+        return False
+    return response.status_code == 304
+
+
+def download_archive(sources, path, sha256=None, on_progress=None, should_stop=None, on_failover=None):
+    """Download the archive into path from the first of sources that works, reusing whatever is already staged there.
+
+    Staged bytes are only reused while they are known to belong to the current
+    archive: by the shared sha256 if there is one, otherwise by the ETag or
+    Last-Modified of the mirror they came from. When a mirror fails mid-transfer
+    the next one continues from the same byte if sha256 is known, from the
+    start if not. Returns False if should_stop interrupted the download, True
+    once path holds the whole archive.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    meta_path = path + '.json'
+    meta = load_staged_meta(meta_path)
+    if meta.get('complete'):
+        if staged_archive_unchanged(path, meta, sources, sha256):
+            return True
+        meta = {}
+    offset = staged_size(path, sources, sha256) if meta else 0
+
+    last_error = None
+    for source in sources:
+        if sha256 and meta.get('sha256') == sha256:
+            start_at, if_range = offset, None
+        elif meta.get('source') == source:
+            start_at, if_range = offset, meta.get('etag') or meta.get('last_modified')
+        else:
+            start_at, if_range = 0, None
+        try:
+            chunks, offset, total, (etag, last_modified) = open_source(
+                source, start_at, if_range)
+            meta = {'source': source, 'etag': etag, 'last_modified': last_modified,
+                    'sha256': sha256, 'complete': False}
+            write_staged_meta(meta_path, meta)
+            with open(path, 'r+b' if offset else 'wb') as file:
+                file.seek(offset)
+                file.truncate()
+                for chunk in chunks:
+                    if should_stop and should_stop():
+                        chunks.close()
+                        return False
+                    file.write(chunk)
+                    offset += len(chunk)
+                    if on_progress:
+                        on_progress(offset, total)
+        except (requests.RequestException, OSError) as e:
+            last_error = e
+            if on_failover:
+                on_failover(source, e)
+            continue
+        break
+    else:
+        raise last_error or OSError('No mirror configured for the Spotr archive')
+
+    if sha256 and file_sha256(path) != sha256:
+        os.remove(path)
+        os.remove(meta_path)
+        raise OSError('The downloaded archive does not match its SHA-256')
+    meta['complete'] = True
+    write_staged_meta(meta_path, meta)
+    return True
+
+
+class HTTPRangeFile:
+    """Read-only, seekable view of a remote file that only fetches the ranges read"""
+
+    def __init__(self, url, size):
+        self.url = url
+        self.size = size
+        self.position = 0
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self.position
+        elif whence == os.SEEK_END:
+            offset += self.size
+        self.position = offset
+        return self.position
+
+    def read(self, size=-1):
+        end = self.size if size is None or size < 0 else min(
+            self.size, self.position + size)
+        if end <= self.position:
+            return b''
+        response = requests.get(
+            self.url, headers={**ARCHIVE_REQUEST_HEADERS, 'Range': f'bytes={self.position}-{end - 1}'},
+            stream=True, timeout=10)
+        if response.status_code != 206:
+            response.close()
+            raise OSError(f'Range request refused: {response.status_code}')
+        data = response.content
+        self.position += len(data)
+        return data
+
+
+def measure_archive(sources, sha256=None):
+    """Return the download size and extracted size of the archive.
+
+    The extracted size is read from the zip central directory, either in the
+    staged copy, the first mirror or over Range requests. Whatever the server
+    won't reveal is estimated.
+    """
+    meta = load_staged_meta(STAGED_ARCHIVE_PATH + '.json')
+    archive_path = local_source_path(sources[0])
+    if meta.get('complete') and staged_size(STAGED_ARCHIVE_PATH, sources, sha256):
+        archive_path = STAGED_ARCHIVE_PATH
+    if archive_path:
+        try:
+            download_size = os.path.getsize(archive_path)
+            with zipfile.ZipFile(archive_path) as archive:
+                return download_size, sum(info.file_size for info in archive.infolist())
+        except zipfile.BadZipFile:
+            # Only zips list their extracted size up front
+            return download_size, download_size * EXTRACT_RATIO_ESTIMATE
+        except OSError:
+            pass
+    if local_source_path(sources[0]):
+        return ARCHIVE_SIZE_ESTIMATE, ARCHIVE_SIZE_ESTIMATE * EXTRACT_RATIO_ESTIMATE
+
+    response = requests.head(sources[0], headers=ARCHIVE_REQUEST_HEADERS,
+                             allow_redirects=True, timeout=10)
+    length = int(response.headers.get('Content-Length', 0)) if response.ok else 0
+    download_size = length or ARCHIVE_SIZE_ESTIMATE
+    if length and response.headers.get('Accept-Ranges') == 'bytes':
+        try:
+            with zipfile.ZipFile(HTTPRangeFile(response.url, length)) as archive:
+                return download_size, sum(info.file_size for info in archive.infolist())
+        except (OSError, zipfile.BadZipFile, requests.RequestException):
+            pass
+    return download_size, download_size * EXTRACT_RATIO_ESTIMATE
+
+
+def existing_parent(path):
+    """Closest directory at or above path that exists, the install creates the rest"""
+    path = os.path.abspath(path)
+    while not os.path.isdir(path) and os.path.dirname(path) != path:
+        path = os.path.dirname(path)
+    return path
+
+
+def required_space(download_size, extracted_size):
+    return download_size + extracted_size + DEPENDENCY_SPACE_ESTIMATE
+
+
+def free_space_shortfall(directory, download_size, extracted_size):
+    """Return why the install won't fit, or None if every volume involved has room"""
+    remaining_download = max(
+        download_size - staged_size(STAGED_ARCHIVE_PATH, ARCHIVE_MIRRORS, ARCHIVE_SHA256), 0)
+    # The archive is staged in the temp folder, which may be on another volume than the install
+    needs = {}
+    for path, size in ((directory, extracted_size + DEPENDENCY_SPACE_ESTIMATE),
+                       (STAGING_DIR, remaining_download)):
+        volume_path = existing_parent(path)
+        volume = needs.setdefault(os.stat(volume_path).st_dev, [volume_path, 0])
+        volume[1] += size
+    for volume_path, size in needs.values():
+        free = shutil.disk_usage(volume_path).free
+        if free < size:
+            return (f"{format_size(size)} of free disk space is required on {volume_path}, "
+                    f"but only {format_size(free)} is available.")
+    return None
+
+
+class PreflightThread(QThread):
+    """Works out how much space the install needs without downloading the archive"""
+    measured = pyqtSignal(int, int)
+
+    def __init__(self, sources, sha256=None):
+        QThread.__init__(self)
+        self.sources = sources
+        self.sha256 = sha256
+
+    def run(self):
+        try:
+            self.measured.emit(*measure_archive(self.sources, self.sha256))
+        except requests.RequestException as e:
+            log.info("Preflight failed: %s", e)
+
+
+class PrefetchThread(QThread):
+    """Downloads the Spotr archive into the staging cache while the user reads the first pages"""
+
+    def __init__(self, sources, path, sha256=None):
+        QThread.__init__(self)
+        # Ranked fastest first once the thread runs, the install reuses the ranking
+        self.sources = sources
+        self.ranked = False
+        self.path = path
+        self.sha256 = sha256
+
+    def run(self):
+        try:
+            self.sources = rank_mirrors(self.sources)
+            self.ranked = True
+            download_archive(self.sources, self.path, self.sha256,
+                             should_stop=self.isInterruptionRequested)
+        except (requests.RequestException, OSError) as e:
+            # The install downloads whatever is missing, so a failed prefetch is not an error
+            log.info("Prefetch failed: %s", e)
+
+
+def read_lines(stream, lines):
+    """Put every line of stream on the lines queue, then None once it ends"""
+    for line in stream:
+        lines.put(line)
+    lines.put(None)
+
+
+class InstallLog:
+    """Bounded buffer of install output, shared between the install thread and the UI"""
+
+    def __init__(self, max_lines=LOG_MAX_LINES):
+        self.lock = threading.Lock()
+        # Lines not yet shown, if the UI falls behind the oldest lines are dropped
+        self.pending = deque(maxlen=max_lines)
+
+    def append(self, message):
+        with self.lock:
+            self.pending.append(message)
+
+    def drain(self):
+        """Return and clear all lines not yet shown"""
+        with self.lock:
+            lines = list(self.pending)
+            self.pending.clear()
+        return lines
+
+
 class InstallThread(QThread):
     update_progress = pyqtSignal(int)
-    update_output = pyqtSignal(str)
     installation_finished = pyqtSignal()
+    installation_failed = pyqtSignal(str)
 
-    def __init__(self, directory):
+    def __init__(self, directory, install_log, refresh_rate=60, prefetch_thread=None, archive_sizes=None):
         QThread.__init__(self)
         self.directory = directory
+        self.install_log = install_log
+        self.prefetch_thread = prefetch_thread
+        self.archive_sizes = archive_sizes or (
+            ARCHIVE_SIZE_ESTIMATE, ARCHIVE_SIZE_ESTIMATE * EXTRACT_RATIO_ESTIMATE)
+        # Progress is never emitted more often than the display can show it
+        self.progress_interval = 1 / refresh_rate
+        self.last_progress = None
+        self.last_progress_time = 0
+
+    def output(self, message):
+        self.install_log.append(message)
+
+    def set_progress(self, value):
+        if value == self.last_progress:
+            return
+        self.last_progress = value
+        self.last_progress_time = time.monotonic()
+        self.update_progress.emit(value)
+
+    def report_download(self, downloaded, total, start=0, end=40):
+        """Map download progress onto the start..end range, rate-limited to the display refresh rate"""
+        if not total:
+            return
+        if time.monotonic() - self.last_progress_time < self.progress_interval:
+            return
+        self.set_progress(start + downloaded * (end - start) // total)
+
+    def report_failover(self, source, error):
+        self.output(f'Download from {source} failed ({error}), trying the next mirror')
 
     def run(self):
-        self.update_progress.emit(0)
-        self.update_output.emit("Starting Installation")
+        # The wizard waits on one of the two signals, so every failure has to end in installation_failed.
+        # Only an interruption, which the wizard asked for itself, ends without either
+        try:
+            self.install()
+        except Exception as e:
+            log.error("Installation failed: %s", e)
+            self.output(f'Installation failed: {e}')
+            self.installation_failed.emit(f'Installation failed: {e}')
+
+    def install(self):
+        self.set_progress(0)
+        self.output("Starting Installation")
+        if self.prefetch_thread:
+            # Take over from the prefetch, download_archive continues from what it staged
+            self.prefetch_thread.requestInterruption()
+            self.prefetch_thread.wait()
+        try:
+            shortfall = free_space_shortfall(self.directory, *self.archive_sizes)
+        except OSError as e:
+            shortfall = f"Could not check the free disk space for {self.directory}: {e}"
+        if shortfall:
+            self.output(shortfall)
+            self.installation_failed.emit(shortfall)
+            return
         os.makedirs(self.directory, exist_ok=True)
-        zip_url = 'https://github.com/TrashName1/spotr/archive/refs/heads/main.zip'
-        zip_path = os.path.join(self.directory, 'file.zip')
-
-        # Use requests to download the file
-        response = requests.get(zip_url, stream=True)
-        if response.status_code == 200:
-            with open(zip_path, 'wb') as file:
-                for chunk in response.iter_content(chunk_size=8192):
-                    file.write(chunk)
+        self.output("Downloading Spotr")
+        if self.prefetch_thread and self.prefetch_thread.ranked:
+            sources = self.prefetch_thread.sources
         else:
-            print(f'Failed to download file: {response.status_code}')
+            sources = rank_mirrors(ARCHIVE_MIRRORS)
+        if not download_archive(sources, STAGED_ARCHIVE_PATH, ARCHIVE_SHA256,
+                                on_progress=self.report_download,
+                                should_stop=self.isInterruptionRequested,
+                                on_failover=self.report_failover):
             return
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(self.directory)
-        os.remove(zip_path)
-        extracted_folder = os.path.join(self.directory, 'spotr-main')
-        new_folder = os.path.join(self.directory, 'Spotr')
-        if os.path.exists(new_folder):
-            shutil.rmtree(new_folder)
-        os.rename(extracted_folder, new_folder)
-        self.update_progress.emit(50)
-        time.sleep(0.5)
-        self.update_output.emit("Installation Complete")
-        self.update_output.emit("Starting Installing Dependencies")
-        time.sleep(1.5)
-        subprocess.Popen(["pip3", "install", "-r", f"{self.directory}/Spotr/requirements.txt"],
-                         stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1, universal_newlines=True)
-        time.sleep(0.3)
-        self.update_progress.emit(90)
-        self.update_output.emit("Dependencies installed")
-        self.update_output.emit("Creating Bat file")
-        time.sleep(0.1)
-        self.update_progress.emit(93)
-        self.update_output.emit("Created spotr.bat")
-        time.sleep(0.1)
-        self.update_progress.emit(96)
-        self.update_output.emit("Writing spotr.bat")
-        time.sleep(0.4)
+        if self.isInterruptionRequested():
+            return
+        self.set_progress(40)
+        self.output("Extracting Spotr")
+        # Extract aside so an old Spotr folder is replaced, never overlaid, whatever the archive's folder is called
+        extract_directory = tempfile.mkdtemp(dir=self.directory)
+        try:
+            try:
+                extracted_root = extract_archive(STAGED_ARCHIVE_PATH, extract_directory)
+            except Exception:
+                # The staged copy passed as complete but isn't a usable archive (e.g. an HTML
+                # error page served with 200), so the next run downloads it again
+                discard_staged_archive()
+                raise
+            new_folder = os.path.join(self.directory, 'Spotr')
+            if os.path.exists(new_folder):
+                shutil.rmtree(new_folder)
+            os.rename(os.path.join(extract_directory, extracted_root), new_folder)
+        finally:
+            shutil.rmtree(extract_directory, ignore_errors=True)
+        discard_staged_archive()
+        self.set_progress(50)
+        self.output("Installation Complete")
+        if self.isInterruptionRequested():
+            return
+        self.output("Starting Installing Dependencies")
+        pip = subprocess.Popen(["pip3", "install", "-r", f"{self.directory}/Spotr/requirements.txt"],
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1, universal_newlines=True)
+        # pip can stay silent for minutes, so its output is read on the side and polled,
+        # letting an interruption through without waiting for the next line
+        pip_lines = queue.Queue()
+        threading.Thread(target=read_lines, args=(pip.stdout, pip_lines), daemon=True).start()
+        # The last lines explain a failure, so keep them for the error message
+        pip_tail = deque(maxlen=5)
+        while True:
+            if self.isInterruptionRequested():
+                pip.terminate()
+                return
+            try:
+                line = pip_lines.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if line is None:
+                break
+            self.output(line.rstrip())
+            pip_tail.append(line.rstrip())
+        if pip.wait() != 0:
+            message = f'Installing dependencies failed (pip exited with {pip.returncode}):\n' + '\n'.join(pip_tail)
+            self.output(message)
+            self.installation_failed.emit(message)
+            return
+        if self.isInterruptionRequested():
+            return
+        self.set_progress(90)
+        self.output("Dependencies installed")
+        self.output("Creating Bat file")
+        self.set_progress(93)
+        self.output("Created spotr.bat")
+        self.set_progress(96)
+        self.output("Writing spotr.bat")
         bat_path = os.path.join(self.directory, "Spotr", "spotr.bat")
         with open(bat_path, "w") as file:
             file.write(
@@ -241,8 +968,8 @@ class InstallThread(QThread):
                 f'python "{os.path.join(
                     self.directory, "Spotr", "spotr.py")}" %1 %2 %3 %4 %5 %6 %7\n'
             )
-        self.update_progress.emit(100)
-        self.update_output.emit("Finnished writing spotr.bat")
+        self.set_progress(100)
+        self.output("Finnished writing spotr.bat")
         self.installation_finished.emit()
         subprocess.Popen(["python", f"{self.directory}/Spotr/install.py"],
                          stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1, universal_newlines=True)
@@ -252,9 +979,21 @@ class Wizard(QWidget):
     def __init__(self):
         super().__init__()
         self.init_ui()
+        self.prefetch_thread = PrefetchThread(
+            ARCHIVE_MIRRORS, STAGED_ARCHIVE_PATH, ARCHIVE_SHA256)
+        # Set to False once the install takes over or the setup is abandoned
+        self.prefetch_allowed = True
+        self.set_archive_sizes(
+            ARCHIVE_SIZE_ESTIMATE, ARCHIVE_SIZE_ESTIMATE * EXTRACT_RATIO_ESTIMATE)
+        self.preflight_thread = PreflightThread(ARCHIVE_MIRRORS, ARCHIVE_SHA256)
+        self.preflight_thread.measured.connect(self.set_archive_sizes)
+        # The prefetch only starts once the preflight knows how much it would stage
+        self.preflight_thread.finished.connect(self.start_prefetch)
+        self.preflight_thread.start()
         self.directory = self.directory_line_edit.text()
         self.api = API('your_spotify_client_id',
                        'your_spotify_client_secret', self.directory)
+        QApplication.instance().aboutToQuit.connect(self.api.export_metrics)
 
     def init_ui(self):
         self.stacked_widget = QStackedWidget()
@@ -428,8 +1167,7 @@ class Wizard(QWidget):
         self.directory_layout.addStretch(1)
         self.directory_buttons_layout = QHBoxLayout()
         self.directory_buttons_layout.addStretch(1)
-        self.fifth_label = QLabel(
-            "At least 105,1 KB of free disk space required.")
+        self.fifth_label = QLabel()
         self.fifth_label.setStyleSheet(
             "margin-left: 35px; margin-bottom: 10px;")
         self.directory_layout.addWidget(self.fifth_label)
@@ -493,6 +1231,10 @@ class Wizard(QWidget):
         self.ready_layout.addLayout(self.ready_buttons_layout)
 
         # Install Layout
+        self.install_indicators = []
+        self.install_thread = None
+        self.installation_done = False
+        self.finish_pending = False
         self.install_widget = QWidget()
         self.install_layout = QVBoxLayout(self.install_widget)
         self.install_first_label = QLabel('Installing')
@@ -504,20 +1246,27 @@ class Wizard(QWidget):
             "margin-left: 35px; margin-right: 50px; margin-bottom: 30px;")
         self.install_layout.addWidget(self.install_first_label)
         self.install_layout.addWidget(self.install_second_label)
-        self.output_label = QLabel()
-        self.output_label.setStyleSheet(
-            "margin-left: 35px; margin-right: 50px;")
-        self.output_label.setWordWrap(True)
-        self.output_label.setMaximumHeight(20)
-        self.output_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.install_layout.addWidget(self.output_label)
         self.progress_bar = QProgressBar()
         self.progress_bar.setStyleSheet(
             "margin-left: 35px; margin-right: 50px;")
         self.progress_bar.setAlignment(Qt.AlignCenter)
         self.install_layout.addWidget(self.progress_bar)
-        # Add stretch to push everything to the top
-        self.install_layout.addStretch(1)
+        self.install_log = InstallLog()
+        self.install_log_view = QPlainTextEdit()
+        self.install_log_view.setReadOnly(True)
+        # Only the latest lines are kept so a verbose install can't grow the view without bound
+        self.install_log_view.setMaximumBlockCount(LOG_MAX_LINES)
+        self.install_log_view.setStyleSheet(
+            "QPlainTextEdit {"
+            "margin-left: 35px;"
+            "margin-right: 50px;"
+            "border: 1px solid #c0c0c0;"
+            "}"
+        )
+        self.install_layout.addWidget(self.install_log_view, 1)
+        self.install_log_timer = QTimer(self)
+        self.install_log_timer.setInterval(LOG_FLUSH_INTERVAL)
+        self.install_log_timer.timeout.connect(self.flush_install_log)
 
         # Authentication Layout
         self.auth_widget = QWidget()
@@ -590,6 +1339,7 @@ class Wizard(QWidget):
         self.auth_checkbox.setChecked(True)
         self.auth_layout.addWidget(self.auth_checkbox)
         self.auth_layout.addStretch(1)
+        self.auth_layout.addLayout(self.create_install_indicator())
         self.auth_buttons_layout = QHBoxLayout()
         self.auth_buttons_layout.addStretch(1)
         self.next_button_auth = QPushButton('Next')
@@ -630,6 +1380,7 @@ class Wizard(QWidget):
             "margin-left: 35px; margin-right: 35px;")
         self.genius_layout.addWidget(self.genius_access_token_input)
         self.genius_layout.addStretch(1)
+        self.genius_layout.addLayout(self.create_install_indicator())
         self.genius_buttons_layout = QHBoxLayout()
         self.genius_buttons_layout.addStretch(1)
         self.back_button_genius = QPushButton('Back')
@@ -697,6 +1448,22 @@ class Wizard(QWidget):
 
 
 
+    def create_install_indicator(self):
+        # Compact install progress shown on the pages the user fills in while Spotr installs
+        indicator_layout = QHBoxLayout()
+        indicator_label = QLabel('Installing Spotr in the background...')
+        indicator_label.setStyleSheet("margin-left: 35px; color: #606060;")
+        indicator_bar = QProgressBar()
+        indicator_bar.setTextVisible(False)
+        indicator_bar.setMaximumHeight(8)
+        indicator_bar.setMaximumWidth(150)
+        indicator_bar.setStyleSheet("margin-right: 35px;")
+        indicator_layout.addWidget(indicator_label)
+        indicator_layout.addStretch(1)
+        indicator_layout.addWidget(indicator_bar)
+        self.install_indicators.append((indicator_label, indicator_bar))
+        return indicator_layout
+
     def set_logo(self, label, image_path):
         pixmap = QPixmap(image_path)
         if pixmap.isNull():
@@ -718,7 +1485,22 @@ class Wizard(QWidget):
     def go_to_directory(self):
         self.stacked_widget.setCurrentWidget(self.directory_widget)
 
+    def set_archive_sizes(self, download_size, extracted_size):
+        self.archive_sizes = (download_size, extracted_size)
+        self.fifth_label.setText(
+            f"At least {format_size(required_space(download_size, extracted_size))} of free disk space required.")
+
     def go_to_ready(self):
+        # Refuse a folder without room before anything is written to it
+        directory = self.directory_line_edit.text()
+        try:
+            shortfall = free_space_shortfall(directory, *self.archive_sizes)
+        except OSError as e:
+            # e.g. a drive letter that doesn't exist or a volume that can't be read
+            shortfall = f"Could not check the free disk space for {directory}: {e}"
+        if shortfall:
+            QMessageBox.warning(self, 'Not Enough Disk Space', shortfall)
+            return
         # Update the display with the latest directory path
         self.update_installation_path_display()
         self.stacked_widget.setCurrentWidget(self.ready_widget)
@@ -727,13 +1509,25 @@ class Wizard(QWidget):
         # Get the directory from the input field
         directory = self.directory_line_edit.text()
         # Pass the directory to the InstallThread
-        self.install_thread = InstallThread(directory)
+        refresh_rate = QApplication.primaryScreen().refreshRate() or 60
+        # The install takes over the download, a prefetch that hasn't started yet never will
+        self.prefetch_allowed = False
+        # Credentials are written into the Spotr folder, so hold them until it's installed
+        self.api.config_path = os.path.join(directory, 'Spotr', 'config.json')
+        self.api.defer_writes = True
+        self.install_thread = InstallThread(
+            directory, self.install_log, refresh_rate, self.prefetch_thread, self.archive_sizes)
         self.install_thread.update_progress.connect(self.set_progress)
-        self.install_thread.update_output.connect(self.append_output)
         self.install_thread.installation_finished.connect(
-            self.show_auth_layout)
+            self.handle_installation_finished)
+        self.install_thread.installation_failed.connect(
+            self.handle_installation_failed)
+        self.install_thread.finished.connect(self.flush_install_log)
+        self.install_thread.finished.connect(self.install_log_timer.stop)
+        self.install_log_timer.start()
         self.install_thread.start()
-        self.stacked_widget.setCurrentWidget(self.install_widget)
+        # The auth pages don't need the install, so let the user continue while it runs
+        self.go_to_auth()
 
     def go_to_auth(self):
         self.stacked_widget.setCurrentWidget(self.auth_widget)
@@ -742,7 +1536,7 @@ class Wizard(QWidget):
         if self.auth_checkbox.isChecked():
             self.go_to_genius()
         else:
-            self.go_to_finish
+            self.go_to_finish()
 
     def copy_to_clipboard(self):
         clipboard = QApplication.clipboard()
@@ -754,6 +1548,13 @@ class Wizard(QWidget):
         self.stacked_widget.setCurrentWidget(self.genius_widget)
 
     def go_to_finish(self):
+        if not self.installation_done:
+            # Wait on the install page until the background install completes
+            self.finish_pending = True
+            self.install_second_label.setText(
+                "Please wait while Spotr Setup finishes installing Spotr on your computer.")
+            self.stacked_widget.setCurrentWidget(self.install_widget)
+            return
         self.stacked_widget.setCurrentWidget(self.finish_widget)
 
     def handle_finish(self):
@@ -804,8 +1605,53 @@ class Wizard(QWidget):
                                      QMessageBox.Yes | QMessageBox.No,
                                      QMessageBox.No)
         if reply == QMessageBox.Yes:
+            self.abandon_setup()
             QApplication.instance().quit()
 
+    def abandon_setup(self):
+        # Staged data may only be removed once nothing downloads into or extracts from it
+        self.stop_install()
+        self.stop_prefetch()
+        self.preflight_thread.wait()
+        discard_staged_archive()
+
+    def stop_install(self):
+        # Let the install finish its current step so the Spotr folder isn't left half-written
+        if self.install_thread:
+            self.install_thread.requestInterruption()
+            if not self.install_thread.wait(INSTALL_STOP_TIMEOUT):
+                # Quitting with the thread still running would abort, so don't wait any longer
+                log.error("Install thread did not stop within %d ms, terminating it", INSTALL_STOP_TIMEOUT)
+                self.install_thread.terminate()
+                self.install_thread.wait()
+
+    def start_prefetch(self):
+        if not self.prefetch_allowed:
+            return
+        # Nothing is transferred into a temp folder that can't hold the archive
+        remaining_download = self.archive_sizes[0] - staged_size(
+            STAGED_ARCHIVE_PATH, ARCHIVE_MIRRORS, ARCHIVE_SHA256)
+        try:
+            free = shutil.disk_usage(existing_parent(STAGING_DIR)).free
+        except OSError as e:
+            log.info("Not prefetching, could not check the free space in %s: %s", STAGING_DIR, e)
+            return
+        if free < remaining_download:
+            log.info("Not prefetching, %s has no room for the archive", STAGING_DIR)
+            return
+        self.prefetch_thread.start(QThread.LowestPriority)
+
+    def stop_prefetch(self):
+        self.prefetch_allowed = False
+
+        self.prefetch_thread.requestInterruption()
+        self.prefetch_thread.wait()
+
+    def closeEvent(self, event):
+        # Closing the window cancels the setup the same way the Cancel button does
+        self.abandon_setup()
+        super().closeEvent(event)
+
     def browse(self):
         directory = QFileDialog.getExistingDirectory(
             self, 'Select Installation Directory', self.directory_line_edit.text(),
@@ -819,13 +1665,28 @@ class Wizard(QWidget):
 
     def set_progress(self, value):
         self.progress_bar.setValue(value)
-
-    def append_output(self, message):
-        # Use append to add text to QTextEdit
-        self.output_label.setText(message)
-
-    def show_auth_layout(self):
-        self.go_to_auth()  # Switch to the authentication layout
+        for _, indicator_bar in self.install_indicators:
+            indicator_bar.setValue(value)
+
+    def flush_install_log(self):
+        # Show everything the install thread logged since the last flush in one append
+        lines = self.install_log.drain()
+        if lines:
+            self.install_log_view.appendPlainText("\n".join(lines))
+
+    def handle_installation_finished(self):
+        self.installation_done = True
+        self.api.resume_writes()
+        for indicator_label, _ in self.install_indicators:
+            indicator_label.setText('Spotr installed')
+        if self.finish_pending:
+            self.go_to_finish()
+
+    def handle_installation_failed(self, message):
+        for indicator_label, _ in self.install_indicators:
+            indicator_label.setText('Installation failed')
+        QMessageBox.critical(self, 'Installation Failed', message)
+        QApplication.instance().quit()
 
     def update_installation_path_display(self):
         # Get the chosen directory path from the directory_line_edit
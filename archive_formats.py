@@ -0,0 +1,82 @@
+""" Archive formats the installer accepts, kept free of Qt so repack_release.py can use them too """
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # Only needed for .tar.zst archives
+
+ARCHIVE_URL = 'https://github.com/TrashName1/spotr/archive/refs/heads/main.zip'
+# Archives are already compressed, and byte ranges only line up with the archive if the transfer isn't
+ARCHIVE_REQUEST_HEADERS = {'Accept-Encoding': 'identity'}
+ARCHIVE_SIGNATURES = (
+    (b'PK\x03\x04', 'zip'),
+    (b'\x1f\x8b', 'gztar'),
+    (b'\xfd7zXZ\x00', 'xztar'),
+    (b'\x28\xb5\x2f\xfd', 'zsttar'),
+)
+
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            break
+        size /= 1024
+    else:
+        unit = 'GB'
+    return f"{size:.1f} {unit}".replace('.', ',')
+
+
+def detect_archive_format(path):
+    """Format of the archive at path, told by its first bytes rather than its name"""
+    with open(path, 'rb') as file:
+        header = file.read(8)
+    for signature, archive_format in ARCHIVE_SIGNATURES:
+        if header.startswith(signature):
+            return archive_format
+    raise ValueError('Unsupported archive format, expected zip, tar.gz, tar.xz or tar.zst')
+
+
+def archive_root(names):
+    """Top-level folder every member of an archive lives in"""
+    roots = {name.replace('\\', '/').lstrip('/').split('/')[0] for name in names}
+    roots.discard('')
+    if len(roots) != 1:
+        raise ValueError('Archive does not contain a single top-level folder')
+    return roots.pop()
+
+
+def extract_archive(path, directory):
+    """Extract a zip, tar.gz, tar.xz or tar.zst archive into directory and return the folder it created.
+
+    Nothing is written to directory unless the archive holds a single top-level folder.
+    """
+    archive_format = detect_archive_format(path)
+    if archive_format == 'zip':
+        with zipfile.ZipFile(path, 'r') as archive:
+            root = archive_root(archive.namelist())
+            archive.extractall(directory)
+        return root
+    if archive_format == 'zsttar' and zstandard is None:
+        raise ValueError('Extracting a .tar.zst archive needs the zstandard package')
+    # Listing a compressed tar up front would decompress it twice, so it is streamed
+    # once into a folder aside and moved in once checked
+    os.makedirs(directory, exist_ok=True)
+    staging_directory = tempfile.mkdtemp(dir=directory)
+    try:
+        with open(path, 'rb') as file:
+            if archive_format == 'zsttar':
+                archive = tarfile.open(fileobj=zstandard.ZstdDecompressor().stream_reader(file), mode='r|')
+            else:
+                archive = tarfile.open(fileobj=file, mode='r|*')
+            with archive:
+                archive.extractall(staging_directory, filter='data')
+                root = archive_root(archive.getnames())
+        os.rename(os.path.join(staging_directory, root), os.path.join(directory, root))
+    finally:
+        shutil.rmtree(staging_directory, ignore_errors=True)
+    return root
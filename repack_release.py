@@ -0,0 +1,159 @@
+""" Repack a Spotr release into every archive format the installer accepts and benchmark them.
+
+SOURCE is a release archive (zip, tar.gz, tar.xz or tar.zst), a folder or a URL,
+by default GitHub's archive of the main branch. Every format is written to the
+output folder, then timed for decompression throughput and for the install time
+it would give: the download at --bandwidth plus extraction. The fastest one is
+the one to publish on the mirrors in mirrors.json.
+"""
+import argparse
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+
+import requests
+
+from archive_formats import (
+    ARCHIVE_URL, ARCHIVE_REQUEST_HEADERS, detect_archive_format, extract_archive, format_size, zstandard
+)
+
+FORMAT_EXTENSIONS = {
+    'zip': '.zip',
+    'gztar': '.tar.gz',
+    'xztar': '.tar.xz',
+    'zsttar': '.tar.zst',
+}
+
+
+def fetch_release(source, workdir):
+    """Return the folder holding the release tree, downloading and extracting it if needed"""
+    if os.path.isdir(source):
+        return os.path.normpath(source)
+    if source.startswith(('http://', 'https://')):
+        archive_path = os.path.join(workdir, 'release')
+        response = requests.get(source, headers=ARCHIVE_REQUEST_HEADERS, stream=True, timeout=10)
+        response.raise_for_status()
+        with open(archive_path, 'wb') as file:
+            for chunk in response.iter_content(chunk_size=65536):
+                file.write(chunk)
+        source = archive_path
+    tree_directory = os.path.join(workdir, 'tree')
+    return os.path.join(tree_directory, extract_archive(source, tree_directory))
+
+
+def write_archive(tree, path, archive_format):
+    root = os.path.basename(tree)
+    if archive_format == 'zip':
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as archive:
+            for folder, _, files in os.walk(tree):
+                for name in sorted(files):
+                    file_path = os.path.join(folder, name)
+                    archive.write(file_path, os.path.join(root, os.path.relpath(file_path, tree)))
+    elif archive_format == 'zsttar':
+        with open(path, 'wb') as file, zstandard.ZstdCompressor(level=19).stream_writer(file) as writer:
+            with tarfile.open(fileobj=writer, mode='w|') as archive:
+                archive.add(tree, arcname=root)
+    else:
+        mode = {'gztar': 'w:gz', 'xztar': 'w:xz'}[archive_format]
+        with tarfile.open(path, mode) as archive:
+            archive.add(tree, arcname=root)
+
+
+def read_members(path):
+    """Decompress every file in the archive without writing it and return the bytes read"""
+    archive_format = detect_archive_format(path)
+    size = 0
+    if archive_format == 'zip':
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                size += len(archive.read(info))
+        return size
+    with open(path, 'rb') as file:
+        if archive_format == 'zsttar':
+            archive = tarfile.open(fileobj=zstandard.ZstdDecompressor().stream_reader(file), mode='r|')
+        else:
+            archive = tarfile.open(fileobj=file, mode='r:*')
+        with archive:
+            for member in archive:
+                member_file = archive.extractfile(member)
+                if member_file:
+                    size += len(member_file.read())
+    return size
+
+
+def best_time(function, runs):
+    """Shortest of several timed runs, and what the last run returned"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def benchmark(path, runs, bandwidth):
+    decompress_time, uncompressed_size = best_time(lambda: read_members(path), runs)
+
+    def extract():
+        directory = tempfile.mkdtemp()
+        try:
+            extract_archive(path, directory)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    extract_time, _ = best_time(extract, runs)
+    archive_size = os.path.getsize(path)
+    download_time = archive_size * 8 / (bandwidth * 1000 * 1000)
+    return {
+        'size': archive_size,
+        'ratio': uncompressed_size / archive_size,
+        'throughput': uncompressed_size / decompress_time,
+        'extract_time': extract_time,
+        'install_time': download_time + extract_time,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Repack a Spotr release into every supported archive format and benchmark them.')
+    parser.add_argument('source', nargs='?', default=ARCHIVE_URL,
+                        help='Release archive, folder or URL (default: the main branch on GitHub)')
+    parser.add_argument('-o', '--output', default='release',
+                        help='Folder to write the archives to (default: release)')
+    parser.add_argument('--bandwidth', type=float, default=50,
+                        help='Download speed in Mbit/s used to estimate install time (default: 50)')
+    parser.add_argument('--runs', type=int, default=3,
+                        help='Timed runs per format, the fastest counts (default: 3)')
+    args = parser.parse_args()
+
+    formats = list(FORMAT_EXTENSIONS)
+    if zstandard is None:
+        print('zstandard is not installed, skipping .tar.zst')
+        formats.remove('zsttar')
+
+    os.makedirs(args.output, exist_ok=True)
+    workdir = tempfile.mkdtemp()
+    try:
+        tree = fetch_release(args.source, workdir)
+        results = {}
+        for archive_format in formats:
+            path = os.path.join(args.output, os.path.basename(tree) + FORMAT_EXTENSIONS[archive_format])
+            write_archive(tree, path, archive_format)
+            results[path] = benchmark(path, args.runs, args.bandwidth)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'Archive':<32} {'Size':>10} {'Ratio':>6} {'Decompress':>14} {'Extract':>9} {'Install':>9}")
+    for path, result in results.items():
+        print(f"{os.path.basename(path):<32} {format_size(result['size']):>10} {result['ratio']:>6.2f} "
+              f"{format_size(result['throughput']) + '/s':>14} {result['extract_time']:>8.3f}s "
+              f"{result['install_time']:>8.3f}s")
+    fastest = min(results, key=lambda path: results[path]['install_time'])
+    print(f"\nFastest install at {args.bandwidth:g} Mbit/s: {fastest}")
+
+
+if __name__ == '__main__':
+    main()